@@ -0,0 +1,341 @@
+// Clientside renderer for the distribution figures.
+// Every evaluator mirrors density_xy / cdf_xy, on the same x, and the axis
+// ranges of the figures of the python class with the same clientside_function name.
+
+const LANCZOS = [
+    676.5203681218851, -1259.1392167224028, 771.32342877765313,
+    -176.61502916214059, 12.507343278686905, -0.13857109526572012,
+    9.9843695780195716e-6, 1.5056327351493116e-7
+];
+const FPMIN = 1e-300;
+const EPS = 1e-15;
+const MAX_ITER = 500;
+
+function lgamma(z) {
+    if (z < 0.5) {
+        return Math.log(Math.PI / Math.abs(Math.sin(Math.PI * z))) - lgamma(1 - z);
+    }
+    z -= 1;
+    let a = 0.99999999999980993;
+    const t = z + 7.5;
+    for (let i = 0; i < LANCZOS.length; i++) {
+        a += LANCZOS[i] / (z + i + 1);
+    }
+    return 0.5 * Math.log(2 * Math.PI) + (z + 0.5) * Math.log(t) - t + Math.log(a);
+}
+
+function xlogy(x, y) {
+    return x === 0 ? 0 : x * Math.log(y);
+}
+
+function xlog1py(x, y) {
+    return x === 0 ? 0 : x * Math.log1p(y);
+}
+
+// Continued fraction of the regularized incomplete beta function
+function betacf(a, b, x) {
+    const qab = a + b;
+    const qap = a + 1;
+    const qam = a - 1;
+    let c = 1;
+    let d = 1 - qab * x / qap;
+    if (Math.abs(d) < FPMIN) d = FPMIN;
+    d = 1 / d;
+    let h = d;
+    for (let m = 1; m <= MAX_ITER; m++) {
+        const m2 = 2 * m;
+        let aa = m * (b - m) * x / ((qam + m2) * (a + m2));
+        d = 1 + aa * d;
+        if (Math.abs(d) < FPMIN) d = FPMIN;
+        c = 1 + aa / c;
+        if (Math.abs(c) < FPMIN) c = FPMIN;
+        d = 1 / d;
+        h *= d * c;
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2));
+        d = 1 + aa * d;
+        if (Math.abs(d) < FPMIN) d = FPMIN;
+        c = 1 + aa / c;
+        if (Math.abs(c) < FPMIN) c = FPMIN;
+        d = 1 / d;
+        const del = d * c;
+        h *= del;
+        if (Math.abs(del - 1) < EPS) break;
+    }
+    return h;
+}
+
+// Regularized incomplete beta function I_x(a, b)
+function betainc(a, b, x) {
+    if (x <= 0) return 0;
+    if (x >= 1) return 1;
+    const lbt = lgamma(a + b) - lgamma(a) - lgamma(b) + a * Math.log(x) + b * Math.log1p(-x);
+    if (x < (a + 1) / (a + b + 2)) {
+        return Math.exp(lbt) * betacf(a, b, x) / a;
+    }
+    return 1 - Math.exp(lbt) * betacf(b, a, 1 - x) / b;
+}
+
+// Regularized lower incomplete gamma function P(a, x)
+function gammainc(a, x) {
+    if (x <= 0) return 0;
+    const lpre = -x + a * Math.log(x) - lgamma(a);
+    if (x < a + 1) {
+        let ap = a;
+        let del = 1 / a;
+        let sum = del;
+        for (let n = 0; n < MAX_ITER; n++) {
+            ap += 1;
+            del *= x / ap;
+            sum += del;
+            if (Math.abs(del) < Math.abs(sum) * EPS) break;
+        }
+        return sum * Math.exp(lpre);
+    }
+    let b = x + 1 - a;
+    let c = 1 / FPMIN;
+    let d = 1 / b;
+    let h = d;
+    for (let i = 1; i <= MAX_ITER; i++) {
+        const an = -i * (i - a);
+        b += 2;
+        d = an * d + b;
+        if (Math.abs(d) < FPMIN) d = FPMIN;
+        c = b + an / c;
+        if (Math.abs(c) < FPMIN) c = FPMIN;
+        d = 1 / d;
+        const del = d * c;
+        h *= del;
+        if (Math.abs(del - 1) < EPS) break;
+    }
+    return 1 - Math.exp(lpre) * h;
+}
+
+// Quantile of an increasing cdf by bisection, searching upwards from lower
+function quantile(cdf, q, lower) {
+    let step = 1;
+    while (cdf(lower + step) < q && step < 1e12) step *= 2;
+    let lo = lower;
+    let hi = lower + step;
+    for (let i = 0; i < 100; i++) {
+        const mid = (lo + hi) / 2;
+        if (cdf(mid) < q) lo = mid; else hi = mid;
+    }
+    return hi;
+}
+
+function linspace(start, stop, num) {
+    const step = (stop - start) / (num - 1);
+    return Array.from({length: num}, (_, i) => start + i * step);
+}
+
+// Piecewise linear interpolation of (xp, fp) at every x, for increasing x and xp
+function interp(x, xp, fp) {
+    let j = 0;
+    return x.map(v => {
+        while (j < xp.length - 2 && xp[j + 1] < v) j++;
+        const t = xp[j + 1] > xp[j] ? (v - xp[j]) / (xp[j + 1] - xp[j]) : 0;
+        return fp[j] + Math.min(Math.max(t, 0), 1) * (fp[j + 1] - fp[j]);
+    });
+}
+
+// Port of adaptive_grid in dist/base.py: grid.points points on [lower, upper]
+// that equidistribute 1 + |f''| / mean(|f''|), with f'' estimated on
+// grid.probe uniform points
+function adaptiveGrid(fn, lower, upper, grid) {
+    if (!(Number.isFinite(lower) && Number.isFinite(upper) && upper > lower)) {
+        return linspace(lower, upper, grid.points);
+    }
+    const x = linspace(lower, upper, grid.probe);
+    const f = x.map(fn);
+    const curvature = [];
+    for (let i = 0; i < f.length - 2; i++) {
+        curvature.push(Math.abs(f[i + 2] - 2 * f[i + 1] + f[i]));
+    }
+    const fill = finiteMax(curvature);
+    const finite = curvature.map(c => (Number.isFinite(c) ? c : fill));
+    const mean = finite.reduce((total, c) => total + c, 0) / finite.length;
+    const weight = finite.map(c => 1 + (mean > 0 ? c / mean : 0));
+
+    // Weight of every probe interval, integrated into a cumulative monitor
+    const padded = [weight[0], ...weight, weight[weight.length - 1]];
+    const monitor = [0];
+    for (let i = 1; i < padded.length; i++) {
+        monitor.push(monitor[i - 1] + (padded[i - 1] + padded[i]) / 2);
+    }
+    return interp(linspace(0, monitor[monitor.length - 1], grid.points), monitor, x);
+}
+
+function arange(start, stop) {
+    return Array.from({length: Math.max(stop - start, 0)}, (_, i) => start + i);
+}
+
+function cumsum(y) {
+    let total = 0;
+    return y.map(v => Math.min(total += v, 1));
+}
+
+// First k where the upper tail mass drops below 0.001 (at least 1, at most
+// 1000), i.e. the end of Distribution.discrete_support
+function supportEnd(pmf) {
+    let total = 0;
+    for (let k = 0; k < 1000; k++) {
+        total += pmf(k);
+        if (1 - total < 0.001) return Math.max(k, 1);
+    }
+    return 1000;
+}
+
+function finiteMax(y) {
+    let result = 0;
+    for (const v of y) {
+        if (Number.isFinite(v) && v > result) result = v;
+    }
+    return result;
+}
+
+function curve(x, y, xrange) {
+    return {x: x, y: y, xrange: xrange || [x[0], x[x.length - 1]]};
+}
+
+// Continuous curves span the same range as Distribution.continuous_support,
+// bounded by the quantiles at CONTINUOUS_TAIL_MASS, on the same adaptive grid.
+// Its sizes come from the clientside spec (ADAPTIVE_MAX_POINTS and
+// ADAPTIVE_PROBE_POINTS), which continuous evaluators get as their grid.
+const CONTINUOUS_TAIL_MASS = 1e-5;
+const NORMAL_TAIL_Z = 4.264890793922825;
+// Fixed like the density_figure xrange of Normal, so moving loc and scale shows
+const NORMAL_DENSITY_XRANGE = [-6, 6];
+
+const EVALUATORS = {
+    binomial: function ({n, p}) {
+        const pmf = k => Math.exp(
+            lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1) + xlogy(k, p) + xlog1py(n - k, -p)
+        );
+        const x = arange(0, n + 1);
+        const y = x.map(pmf);
+        return {density: curve(x, y, [0, n]), cdf: curve(x, cumsum(y), [0, n])};
+    },
+    poisson: function ({mu}) {
+        const pmf = k => Math.exp(xlogy(k, mu) - mu - lgamma(k + 1));
+        const x = arange(0, supportEnd(pmf));
+        const y = x.map(pmf);
+        return {density: curve(x, y, [0, x[x.length - 1]]), cdf: curve(x, cumsum(y), [0, x[x.length - 1]])};
+    },
+    geometric: function ({p}) {
+        const pmf = k => (k < 1 ? 0 : Math.pow(1 - p, k - 1) * p);
+        const x = arange(0, supportEnd(pmf));
+        const y = x.map(pmf);
+        const cdf = x.map(k => (k < 1 ? 0 : 1 - Math.pow(1 - p, k)));
+        return {density: curve(x, y, [0, x[x.length - 1]]), cdf: curve(x, cdf, [0, x[x.length - 1]])};
+    },
+    negative_binomial: function ({n, p}) {
+        const pmf = k => Math.exp(
+            lgamma(k + n) - lgamma(k + 1) - lgamma(n) + xlogy(n, p) + xlog1py(k, -p)
+        );
+        const x = arange(0, supportEnd(pmf));
+        const y = x.map(pmf);
+        const cdf = x.map(k => betainc(n, k + 1, p));
+        return {density: curve(x, y, [0, x[x.length - 1]]), cdf: curve(x, cdf, [0, x[x.length - 1]])};
+    },
+    normal: function ({loc, scale}, grid) {
+        const pdf = v => Math.exp(-0.5 * ((v - loc) / scale) ** 2) / (scale * Math.sqrt(2 * Math.PI));
+        const cdf = v => {
+            const z = (v - loc) / scale;
+            return 0.5 * (1 + Math.sign(z) * gammainc(0.5, z * z / 2));
+        };
+        const x = adaptiveGrid(pdf, loc - scale * NORMAL_TAIL_Z, loc + scale * NORMAL_TAIL_Z, grid);
+        return {density: curve(x, x.map(pdf), NORMAL_DENSITY_XRANGE), cdf: curve(x, x.map(cdf))};
+    },
+    beta: function ({a, b}, grid) {
+        const lbeta = lgamma(a) + lgamma(b) - lgamma(a + b);
+        const pdf = v => ((v < 0 || v > 1) ? 0 : Math.exp(xlogy(a - 1, v) + xlog1py(b - 1, -v) - lbeta));
+        const x = adaptiveGrid(pdf, 0, 1, grid);
+        return {density: curve(x, x.map(pdf), [0, 1]), cdf: curve(x, x.map(v => betainc(a, b, v)), [0, 1])};
+    },
+    exponential: function ({rate, loc, scale}, grid) {
+        const pdf = v => (v < loc ? 0 : Math.exp(-(v - loc) / scale) / scale);
+        const cdf = v => (v < loc ? 0 : -Math.expm1(-(v - loc) / scale));
+        const x = adaptiveGrid(pdf, loc, loc - scale * Math.log(CONTINUOUS_TAIL_MASS), grid);
+        return {density: curve(x, x.map(v => rate * pdf(v))), cdf: curve(x, x.map(cdf))};
+    },
+    gamma: function ({a, scale}, grid) {
+        const pdf = v => (v <= 0 ? 0 : Math.exp(xlogy(a - 1, v / scale) - v / scale - lgamma(a)) / scale);
+        const cdf = v => gammainc(a, v / scale);
+        const x = adaptiveGrid(pdf, 0, quantile(cdf, 1 - CONTINUOUS_TAIL_MASS, 0), grid);
+        return {density: curve(x, x.map(pdf)), cdf: curve(x, x.map(cdf))};
+    },
+};
+
+// Copies the displayed figure with its first trace only, and swaps in the
+// trace data and axis ranges. Skeleton figures get the plotly template.
+function renderFigure(figure, c, template) {
+    const trace = Object.assign({}, figure.data[0], {x: c.x, y: c.y});
+    const layout = Object.assign({template: template}, figure.layout, {
+        xaxis: Object.assign({}, figure.layout.xaxis, {range: c.xrange}),
+        yaxis: Object.assign({}, figure.layout.yaxis, {range: [0, finiteMax(c.y) * 1.1]}),
+    });
+    return {data: [trace], layout: layout};
+}
+
+const TYPED_ARRAYS = {f4: Float32Array, f8: Float64Array};
+
+// Decodes a base64 typed array spec {dtype, bdata} (see dist/encoding.py)
+function decodeArray(value) {
+    if (!value || value.bdata === undefined) {
+        return value;
+    }
+    const binary = atob(value.bdata);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return new TYPED_ARRAYS[value.dtype](bytes.buffer);
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    distributions: {
+        select_distribution: function (_) {
+            const triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered || triggered.length === 0 || !triggered[0].value) {
+                return window.dash_clientside.no_update;
+            }
+            const propId = triggered[0].prop_id;
+            return JSON.parse(propId.slice(0, propId.lastIndexOf('.'))).index;
+        },
+        show_distribution: function (active, panelIds, info) {
+            const styles = panelIds.map(id => (id.index === active ? {} : {display: 'none'}));
+            return [styles, styles, info[active].title, info[active].description];
+        },
+        request_render: function (style, density) {
+            // Skeletons have no trace y. Test y rather than x, binary encoded
+            // figures carry evenly spaced x as x0/dx.
+            const shown = !style || style.display !== 'none';
+            if (!shown || density.data[0].y !== undefined) {
+                return window.dash_clientside.no_update;
+            }
+            return Date.now();
+        },
+        update_figure: function (sliderValues, renderRequest, sliderIds, density, cumulative, spec) {
+            const parameters = {};
+            sliderIds.forEach((slider, i) => {
+                parameters[slider.parameter] = sliderValues[i];
+            });
+            const curves = EVALUATORS[spec.evaluators[sliderIds[0].index]](parameters, spec.grid);
+            return [
+                renderFigure(density, curves.density, spec.template),
+                renderFigure(cumulative, curves.cdf, spec.template),
+            ];
+        },
+        decode_figures: function (figures) {
+            return figures.map(figure => Object.assign({}, figure, {
+                data: figure.data.map(trace => {
+                    const decoded = Object.assign({}, trace, {y: decodeArray(trace.y)});
+                    if (trace.x !== undefined) {
+                        decoded.x = decodeArray(trace.x);
+                    }
+                    return decoded;
+                }),
+            }));
+        },
+    },
+});
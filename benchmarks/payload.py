@@ -0,0 +1,22 @@
+"""
+Size of the serialized trace data of every distribution at its default
+parameters, as json lists and in the binary encoding.
+
+    python -m benchmarks.payload
+"""
+from constants import DISTNAME2DIST
+from dist import encode_figure, payload_size
+
+
+def main():
+    print(f"{'distribution':<20}{'json':>10}{'float64':>10}{'float32':>10}{'reduction':>11}")
+    for name, distribution in DISTNAME2DIST.items():
+        figures = distribution.get_figures(**distribution.default_parameters())
+        plain = sum(payload_size(f) for f in figures)
+        f8 = sum(payload_size(encode_figure(f, 'float64')) for f in figures)
+        f4 = sum(payload_size(encode_figure(f, 'float32')) for f in figures)
+        print(f"{name:<20}{plain:>10}{f8:>10}{f4:>10}{plain / f4:>10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
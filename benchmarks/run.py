@@ -0,0 +1,322 @@
+"""
+Latency, allocation and payload benchmarks for every distribution and the
+server side figure callback.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json --tolerance 0.2
+
+Every benchmark runs in --processes fresh interpreters, of which the fastest
+counts. With --baseline the results are compared against a stored run, and
+the exit code is 1 when the best round median latency or the payload of any
+benchmark grew by more than the tolerance (and latency by more than
+--min-delta-ms).
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# The figure callback only runs on the server in server render mode
+os.environ.setdefault('RENDER_MODE', 'server')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from constants import DISTNAME2DIST, D2I  # noqa: E402
+from dist import CACHE  # noqa: E402
+from plotly.utils import PlotlyJSONEncoder  # noqa: E402
+
+
+def parameter_grid(distribution, points):
+    """
+    Returns up to points values per parameter, evenly spread over min..max and
+    snapped to the slider step, combined into every parameter set
+    :param distribution: Distribution
+    :param points: values per parameter
+    :return:
+    list of parameter dicts
+    """
+    axes = []
+    for parameter, values in distribution.parameters.items():
+        raw = np.linspace(values['min'], values['max'], points)
+        axes.append(sorted({distribution.quantize(**{parameter: v.item()})[parameter] for v in raw}))
+    names = list(distribution.parameters)
+    return [dict(zip(names, combination)) for combination in itertools.product(*axes)]
+
+
+def serialize(figures):
+    return json.dumps(figures, cls=PlotlyJSONEncoder)
+
+
+def time_pass(fn, grid, cold):
+    """
+    Times one call of fn per parameter set of grid, with the garbage
+    collector paused like timeit does, so a collection doesn't land in a call.
+    Unless cold, the grid is run through once untimed to fill the cache.
+    :return:
+    list of seconds
+    """
+    if not cold:
+        # Cold benchmarks clear the cache, so warm ones refill it every pass
+        for parameters in grid:
+            fn(**parameters)
+
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for parameters in grid:
+            if cold:
+                CACHE.clear()
+            start = time.perf_counter()
+            fn(**parameters)
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return timings
+
+
+def measure(benchmarks, repeat, warmup=1):
+    """
+    Times every benchmark over its parameter grid. After warmup passes, the
+    repeat rounds are interleaved: every round makes one pass of every
+    benchmark, so drift in load or clock speed hits all of them alike.
+    :param benchmarks: dict mapping name to (fn, grid, cold), where fn takes
+        the parameters as keyword arguments, grid is a list of parameter dicts
+        and cold clears the distribution cache before every call
+    :param repeat: number of rounds
+    :param warmup: number of untimed passes before the first round
+    :return:
+    dict mapping name to p50_ms, p99_ms, best_p50_ms (the lowest median of
+    a single round), peak_alloc_bytes and calls
+    """
+    for fn, grid, cold in benchmarks.values():
+        for _ in range(warmup):
+            time_pass(fn, grid, cold)
+
+    timings = {name: [] for name in benchmarks}
+    round_medians = {name: [] for name in benchmarks}
+    for _ in range(repeat):
+        for name, (fn, grid, cold) in benchmarks.items():
+            pass_timings = time_pass(fn, grid, cold)
+            timings[name].extend(pass_timings)
+            round_medians[name].append(np.median(pass_timings))
+
+    results = {}
+    for name, (fn, grid, cold) in benchmarks.items():
+        # Allocations in a separate pass, tracemalloc distorts the timings
+        peak = 0
+        for parameters in grid:
+            if cold:
+                CACHE.clear()
+            tracemalloc.start()
+            fn(**parameters)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        ms = np.array(timings[name]) * 1000
+        results[name] = dict(
+            p50_ms=float(np.percentile(ms, 50)),
+            p99_ms=float(np.percentile(ms, 99)),
+            best_p50_ms=float(np.min(round_medians[name]) * 1000),
+            peak_alloc_bytes=int(peak),
+            calls=len(ms),
+        )
+    return results
+
+
+def benchmark_distribution(distribution, grid, repeat):
+    figures = {json.dumps(p, sort_keys=True): distribution.get_figures(**p) for p in grid}
+    results = measure(dict(
+        density_xy=(distribution.density_xy, grid, True),
+        cdf_xy=(distribution.cdf_xy, grid, True),
+        get_figures=(distribution.get_figures, grid, True),
+        get_figures_cached=(distribution.get_figures, grid, False),
+        serialize=(lambda **p: serialize(figures[json.dumps(p, sort_keys=True)]), grid, False),
+    ), repeat)
+    results['serialize']['payload_bytes'] = int(np.mean([len(serialize(f)) for f in figures.values()]))
+    return results
+
+
+def figure_callback_request(dependencies, index, parameters):
+    """
+    Builds the body dash-renderer posts when a slider of distribution index
+    changes, for the server side figure callback among dependencies
+    """
+    from dash._utils import split_callback_id
+
+    dependency = next(
+        d for d in dependencies
+        if not d.get('clientside_function') and any('"type":"slider"' in i['id'] for i in d['inputs'])
+    )
+
+    def resolve(id_string):
+        id_ = json.loads(id_string)
+        return {k: (index if v == ['MATCH'] else v) for k, v in id_.items()}
+
+    outputs = split_callback_id(dependency['output'])
+    if isinstance(outputs, dict):
+        outputs = dict(id=resolve(outputs['id']), property=outputs['property'])
+    else:
+        outputs = [dict(id=resolve(o['id']), property=o['property']) for o in outputs]
+
+    slider_ids = [{'type': 'slider', 'index': index, 'parameter': p} for p in parameters]
+    return dict(
+        output=dependency['output'],
+        outputs=outputs,
+        inputs=[
+            [dict(id=i, property='value', value=parameters[i['parameter']]) for i in slider_ids],
+            dict(id={'type': 'render-request', 'index': index}, property='data', value=None),
+        ],
+        state=[[dict(id=i, property='id', value=i) for i in slider_ids]],
+        changedPropIds=[json.dumps(slider_ids[0], sort_keys=True, separators=(',', ':')) + '.value'],
+    )
+
+
+def benchmark_callbacks(grids, repeat):
+    """
+    Drives the server side update_figure callback through the flask test
+    client of the app, no browser involved. Switching distributions is a
+    clientside callback since the component tree is mounted once, so only
+    the initial layout request is measured for it.
+    """
+    import main
+
+    client = main.app.server.test_client()
+    payload_bytes = {}
+
+    def get_layout():
+        payload_bytes['layout'] = len(client.get('/_dash-layout').data)
+
+    benchmarks = dict(layout=(get_layout, [{}] * 10, False))
+
+    dependencies = client.get('/_dash-dependencies').get_json()
+
+    def figure_callback(name, grid):
+        requests = {json.dumps(p, sort_keys=True): figure_callback_request(dependencies, D2I[name], p) for p in grid}
+
+        def update_figure(**parameters):
+            response = client.post('/_dash-update-component', json=requests[json.dumps(parameters, sort_keys=True)])
+            assert response.status_code == 200, response.data
+            payload_bytes.setdefault(f'update_figure/{name}', []).append(len(response.data))
+        return update_figure
+
+    for name, grid in grids.items():
+        if name in D2I:
+            benchmarks[f'update_figure/{name}'] = (figure_callback(name, grid), grid, True)
+
+    results = measure(benchmarks, repeat)
+    for key, sizes in payload_bytes.items():
+        results[key]['payload_bytes'] = int(np.mean(sizes))
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Prints every metric next to the baseline and returns the regressions.
+    Latency is compared on best_p50_ms, the lowest median of the interleaved
+    rounds, which background load can only raise. It only regresses when it
+    also grew by more than min_delta_ms, so timer and scheduler noise on
+    short calls doesn't fail the comparison.
+    """
+    regressions = []
+    print(f"{'benchmark':<50}{'p50 ms':>10}{'best ms':>10}{'base':>10}{'p99 ms':>10}{'bytes':>10}{'base':>10}")
+    for key, result in results.items():
+        base = baseline.get(key, {})
+        line = f"{key:<50}{result['p50_ms']:>10.3f}{result['best_p50_ms']:>10.3f}"
+        line += f"{base.get('best_p50_ms', float('nan')):>10.3f}{result['p99_ms']:>10.3f}"
+        line += f"{result.get('payload_bytes', ''):>10}{base.get('payload_bytes', ''):>10}"
+        print(line)
+
+        if 'best_p50_ms' in base:
+            slower = result['best_p50_ms'] - base['best_p50_ms']
+            if result['best_p50_ms'] > base['best_p50_ms'] * (1 + tolerance) and slower > min_delta_ms:
+                regressions.append(f"{key}: best p50 {base['best_p50_ms']:.3f} -> {result['best_p50_ms']:.3f} ms")
+        if 'payload_bytes' in result and 'payload_bytes' in base:
+            if result['payload_bytes'] > base['payload_bytes'] * (1 + tolerance):
+                regressions.append(f"{key}: payload {base['payload_bytes']} -> {result['payload_bytes']} bytes")
+    return regressions
+
+
+def flatten(results):
+    return {f'{group}/{name}': metrics for group, group_results in results.items() for name, metrics in group_results.items()}
+
+
+def run_processes(args):
+    """
+    Runs the benchmarks in args.processes fresh interpreters and keeps, per
+    benchmark, the results of the fastest one. Timings shift between
+    processes (memory layout, scheduling), so one process alone is not
+    comparable to another.
+    :return:
+    flat results dict
+    """
+    argv = [
+        '--points', str(args.points), '--repeat', str(args.repeat), '--processes', '1',
+        '--distributions', *args.distributions,
+    ]
+    if args.no_callbacks:
+        argv.append('--no-callbacks')
+
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(args.processes):
+            output = os.path.join(directory, f'{i}.json')
+            subprocess.run(
+                [sys.executable, '-m', 'benchmarks.run', *argv, '--output', output],
+                cwd=ROOT, capture_output=True, check=True,
+            )
+            with open(output) as f:
+                runs.append(json.load(f))
+    return {key: min((run[key] for run in runs), key=lambda r: r['best_p50_ms']) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, default=4, help='parameter values per slider')
+    parser.add_argument('--repeat', type=int, default=5, help='interleaved rounds over every parameter grid')
+    parser.add_argument('--processes', type=int, default=3, help='fresh interpreters to run in, the fastest counts')
+    parser.add_argument('--distributions', nargs='*', default=list(DISTNAME2DIST), help='distributions to run')
+    parser.add_argument('--no-callbacks', action='store_true', help='skip the dash callback benchmarks')
+    parser.add_argument('--output', help='write the results as json to this file')
+    parser.add_argument('--baseline', help='compare against the json results in this file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown or growth')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='latency growth always allowed')
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        results = run_processes(args)
+    else:
+        grids = {name: parameter_grid(DISTNAME2DIST[name], args.points) for name in args.distributions}
+
+        results = {}
+        for name, grid in grids.items():
+            results[name] = benchmark_distribution(DISTNAME2DIST[name], grid, args.repeat)
+        if not args.no_callbacks:
+            results['callbacks'] = benchmark_callbacks(grids, args.repeat)
+        results = flatten(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print('\nRegressions:')
+        print('\n'.join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Cold start instrumentation: per package import cost of the app, and the time
+until a fresh worker has imported main and served its first layout.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --top 20 --output startup.json
+"""
+import argparse
+from collections import defaultdict
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Local modules are reported individually, third party modules per package
+LOCAL_PACKAGES = ('main', 'constants', 'dist')
+
+READINESS_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+client = main.app.server.test_client()
+client.get('/_dash-layout')
+served = time.perf_counter()
+main.prewarm().join()
+print(json.dumps(dict(
+    import_main_s=imported - start,
+    first_layout_s=served - imported,
+    distribution_load_s=main.DISTNAME2DIST.load_times,
+)))
+"""
+
+
+def run(args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def import_costs(statement='import main'):
+    """
+    Runs statement in a fresh interpreter with -X importtime, and sums the
+    self time of every imported module per package
+    :param statement: python statement to import
+    :return:
+    dict mapping package to seconds, most expensive first
+    """
+    costs = defaultdict(float)
+    for line in run(['-X', 'importtime', '-c', statement]).stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, module = (part.strip() for part in line[len('import time:'):].split('|'))
+        package = module.split('.')[0]
+        costs[module if package in LOCAL_PACKAGES else package] += int(self_us) / 1e6
+    return dict(sorted(costs.items(), key=lambda item: -item[1]))
+
+
+def readiness():
+    """
+    Times importing main and serving the first layout in a fresh interpreter
+    :return:
+    dict
+    """
+    return json.loads(run(['-c', READINESS_SCRIPT]).stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15, help='number of packages to list')
+    parser.add_argument('--output', help='write the results as json to this file')
+    args = parser.parse_args()
+
+    costs = import_costs()
+    timings = readiness()
+
+    print(f"{'package':<40}{'import s':>10}")
+    for package, seconds in list(costs.items())[:args.top]:
+        print(f"{package:<40}{seconds:>10.3f}")
+    print(f"{'total':<40}{sum(costs.values()):>10.3f}\n")
+
+    print(f"import main:          {timings['import_main_s']:.3f} s")
+    print(f"first layout request: {timings['first_layout_s']:.3f} s")
+    for name, seconds in timings['distribution_load_s'].items():
+        print(f"  load {name:<16}{seconds:.3f} s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(import_costs=costs, **timings), f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
-from dist import Distribution, Binomial, Poisson, Geometric, NegativeBinomial, Normal, Beta, Exponential, Gamma
-from typing import Dict, List
+from dist import Distribution, LazyRegistry
+from dist.encoding import DTYPE_CODES
+from typing import Dict, List, Mapping
+import os
 
 BINOM = 'Binomial'
 POISSON = 'Poisson'
@@ -27,18 +29,39 @@ DIST_NAMES.sort()
 
 INITIAL_DISTRIBUTION: str = BINOM
 
+# Figures are either rendered in the browser (slider drags never reach the
+# server) or by the server-side update_figure callback as a fallback.
+CLIENTSIDE = 'clientside'
+SERVER = 'server'
+RENDER_MODE: str = os.environ.get('RENDER_MODE', CLIENTSIDE)
+
+# Server rendered figures are sent as json lists by default. The binary
+# encoding sends the trace data as base64 typed arrays of FIGURE_FLOAT_DTYPE
+# (evenly spaced x as x0/dx), which the browser decodes before plotting.
+JSON = 'json'
+BINARY = 'binary'
+FIGURE_ENCODING: str = os.environ.get('FIGURE_ENCODING', JSON)
+FIGURE_FLOAT_DTYPE: str = os.environ.get('FIGURE_FLOAT_DTYPE', 'float32')
+if FIGURE_FLOAT_DTYPE not in DTYPE_CODES:
+    raise ValueError(f"FIGURE_FLOAT_DTYPE must be one of {', '.join(DTYPE_CODES)}, not {FIGURE_FLOAT_DTYPE!r}")
+
 D2I: Dict[str, int] = {d: i for i, d in enumerate(DIST_NAMES)}
 I2D: Dict[int, str] = {i: d for d, i in D2I.items()}
 
-DISTNAME2DIST: Dict[str, Distribution] = {
-    BINOM: Binomial(),
-    POISSON: Poisson(),
-    GEOM: Geometric(),
-    NBINOM: NegativeBinomial(),
-    NORM: Normal(),
-    BETA: Beta(),
-    EXPON: Exponential(),
-    GAMMA: Gamma(),
-}
-
+# Distributions are imported and instantiated on first lookup
+DISTNAME2DIST: Mapping[str, Distribution] = LazyRegistry({
+    BINOM: 'dist.binomial:Binomial',
+    POISSON: 'dist.poisson:Poisson',
+    GEOM: 'dist.geometric:Geometric',
+    NBINOM: 'dist.negative_binomial:NegativeBinomial',
+    NORM: 'dist.normal:Normal',
+    BETA: 'dist.beta:Beta',
+    EXPON: 'dist.exponential:Exponential',
+    GAMMA: 'dist.gamma:Gamma',
+})
 
+# Monte Carlo overlay: the sample size the input starts at and its upper
+# bound, and how often the browser polls a running job for new counts
+SAMPLING_DEFAULT_SIZE: int = 1_000_000
+SAMPLING_MAX_SIZE: int = 100_000_000
+SAMPLING_INTERVAL_MS: int = 250
@@ -1,10 +1,25 @@
-from .base import Distribution
-from .constants import BASE_FIGURE_LAYOUT
-from .binomial import Binomial
-from .poisson import Poisson
-from .geometric import Geometric
-from .negative_binomial import NegativeBinomial
-from .normal import Normal
-from .beta import Beta
-from .exponential import Exponential
-from .gamma import Gamma
+from importlib import import_module
+
+from .base import Distribution, LRUCache, CACHE, cached
+from .constants import BASE_FIGURE_LAYOUT, BASE_FIGURE_DICT_LAYOUT
+from .encoding import encode_figure, payload_size
+from .registry import LazyRegistry
+from .sampling import BinnedSketch, SamplingJob, Sampler, SAMPLER, overlay_traces
+
+# The distributions import scipy.stats, so their modules are only imported on first access
+_DISTRIBUTION_MODULES = {
+    'Binomial': '.binomial',
+    'Poisson': '.poisson',
+    'Geometric': '.geometric',
+    'NegativeBinomial': '.negative_binomial',
+    'Normal': '.normal',
+    'Beta': '.beta',
+    'Exponential': '.exponential',
+    'Gamma': '.gamma',
+}
+
+
+def __getattr__(name):
+    if name in _DISTRIBUTION_MODULES:
+        return getattr(import_module(_DISTRIBUTION_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
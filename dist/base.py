@@ -1,7 +1,245 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+import sys
+
+import numpy as np
+
+from .constants import (
+    BASE_FIGURE_DICT_LAYOUT, CACHE_MAX_BYTES, FIGURE_CACHE, SUPPORT_TAIL_MASS, SUPPORT_MAX,
+    CONTINUOUS_TAIL_MASS, ADAPTIVE_MAX_POINTS, ADAPTIVE_PROBE_POINTS, SAMPLING_BINS,
+)
+
+
+def shared_ids(value):
+    """
+    Returns the ids of the containers nested in value
+    :param value: dict or list
+    :return:
+    set of int
+    """
+    ids = {id(value)}
+    children = value.values() if isinstance(value, dict) else value
+    for child in children:
+        if isinstance(child, (dict, list)):
+            ids |= shared_ids(child)
+    return ids
+
+
+# Every figure layout references the containers of BASE_FIGURE_DICT_LAYOUT,
+# among which the plotly template, so they are not counted per cache entry
+SHARED_IDS = frozenset(shared_ids(BASE_FIGURE_DICT_LAYOUT))
+
+
+def arrays(value):
+    """
+    Returns the numpy arrays nested in a cached value, by id
+    :param value: numpy array, or (nested) containers of those
+    :return:
+    dict mapping id to np.ndarray
+    """
+    if isinstance(value, np.ndarray):
+        return {id(value): value}
+    if id(value) in SHARED_IDS or not isinstance(value, (dict, list, tuple)):
+        return {}
+    found = {}
+    for child in value.values() if isinstance(value, dict) else value:
+        found.update(arrays(child))
+    return found
+
+
+def sizeof(value):
+    """
+    Estimates the memory footprint of a cached value in bytes, leaving out the
+    containers shared with BASE_FIGURE_DICT_LAYOUT and the numpy arrays, which
+    LRUCache counts once however many entries hold them
+    :param value: numpy array, or (nested) containers of those
+    :return:
+    int
+    """
+    if isinstance(value, np.ndarray) or id(value) in SHARED_IDS:
+        return 0
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread safe least recently used cache, bounded by the estimated size in
+    bytes of the values it holds rather than by the number of entries.
+    Arrays held by several entries, like the x of a distribution shared by its
+    curves and figures, are counted once and freed with the last of them.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        # id -> [number of entries holding the array, nbytes]
+        self._arrays = {}
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = sizeof(value)
+        held = arrays(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size + sum(array.nbytes for array in held.values()) > self.max_bytes:
+                return
+            self._entries[key] = (value, size, tuple(held))
+            self.current_bytes += size
+            for array_id, array in held.items():
+                refs = self._arrays.setdefault(array_id, [0, array.nbytes])
+                if refs[0] == 0:
+                    self.current_bytes += refs[1]
+                refs[0] += 1
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, array_ids = self._entries.pop(key)
+        self.current_bytes -= size
+        for array_id in array_ids:
+            refs = self._arrays[array_id]
+            refs[0] -= 1
+            if refs[0] == 0:
+                self.current_bytes -= refs[1]
+                del self._arrays[array_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._arrays.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                bytes=self.current_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+
+CACHE = LRUCache(max_bytes=CACHE_MAX_BYTES)
+
+
+def cached(method):
+    """
+    Memoizes a Distribution method in the shared CACHE. The parameters are
+    snapped to the slider grid first (see Distribution.quantize), so the key
+    space is finite and the method is evaluated on the snapped values.
+    Cached results are shared, so their arrays are made read-only.
+    """
+    @wraps(method)
+    def wrapper(self, **kwargs):
+        kwargs = self.quantize(**kwargs)
+        key = (type(self).__name__, method.__name__, tuple(sorted(kwargs.items())))
+        result = CACHE.get(key)
+        if result is None:
+            result = method(self, **kwargs)
+            for array in arrays(result).values():
+                array.flags.writeable = False
+            CACHE.put(key, result)
+        return result
+    return wrapper
+
+
+def adaptive_grid(fn, lower, upper, num=ADAPTIVE_MAX_POINTS, probe=ADAPTIVE_PROBE_POINTS):
+    """
+    Places num points on [lower, upper], denser where fn bends. fn is probed on
+    a uniform grid, and the points equidistribute 1 + |f''| / mean(|f''|), so
+    half of them are spread uniformly and half follow the curvature.
+    :param fn: vectorized function, usually a pdf
+    :param lower: float
+    :param upper: float
+    :param num: number of points to return
+    :param probe: number of uniform points used to estimate the curvature
+    :return:
+    x : np.ndarray
+    """
+    if not (np.isfinite(lower) and np.isfinite(upper) and upper > lower):
+        return np.linspace(lower, upper, num)
+
+    x = np.linspace(lower, upper, probe)
+    with np.errstate(all='ignore'):
+        curvature = np.abs(np.diff(fn(x), n=2))
+    finite = np.isfinite(curvature)
+    curvature[~finite] = np.max(curvature[finite], initial=0.0)
+    mean = curvature.mean()
+    weight = 1 + (curvature / mean if mean > 0 else 0)
+
+    # Weight of every probe interval, integrated into a cumulative monitor
+    weight = np.pad(weight, 1, mode='edge')
+    monitor = np.concatenate(([0.0], np.cumsum((weight[:-1] + weight[1:]) / 2)))
+    return np.interp(np.linspace(0, monitor[-1], num), monitor, x)
+
+
+def build_figure(spec, x, y):
+    """
+    Builds a plain figure dict from BASE_FIGURE_DICT_LAYOUT, which skips the
+    validation go.Figure would do on construction.
+    :param spec: dict with
+        title <- figure title
+        trace <- 'bar' or 'scatter'
+        xtitle, ytitle <- axis titles
+        xrange <- optional fixed x-axis range, defaults to the range of x
+    :param x: np.ndarray
+    :param y: np.ndarray
+    :return:
+    figure dict
+    """
+    trace = dict(type=spec['trace'], x=x, y=y)
+    if spec['trace'] == 'scatter':
+        trace['mode'] = 'lines'
+    xrange = spec.get('xrange') or [np.min(x), np.max(x)]
+    layout = dict(
+        BASE_FIGURE_DICT_LAYOUT,
+        title=dict(text=spec['title'], x=0.5, xanchor='center'),
+        xaxis=dict(BASE_FIGURE_DICT_LAYOUT['xaxis'], range=xrange, title=dict(text=spec['xtitle'])),
+        yaxis=dict(BASE_FIGURE_DICT_LAYOUT['yaxis'], range=[0, np.max(y) * 1.1], title=dict(text=spec['ytitle'])),
+    )
+    return dict(data=[trace], layout=layout)
 
 
 class Distribution(ABC):
+    """
+    Subclasses set in __init__:
+        description <- markdown description
+        fn <- scipy.stats distribution
+        clientside_function <- name of the javascript evaluator
+        parameters <- slider settings per parameter
+        discrete <- whether the distribution is discrete
+        density_figure, cumulative_figure <- figure specs, see build_figure
+    """
     @abstractmethod
     def density_xy(self, **kwargs):
         """
@@ -28,32 +266,162 @@ class Distribution(ABC):
         """
         raise NotImplementedError
 
-    @abstractmethod
+    @cached
+    def curves_xy(self, **kwargs):
+        """
+        Returns the density and cumulative curves in a single pass. For discrete
+        distributions the cdf is the cumulative sum of the pmf on the same x.
+        :param kwargs:
+        :return:
+        x : np.ndarray
+        density : np.ndarray
+        x_cdf : np.ndarray
+        cdf : np.ndarray
+        """
+        x, density = self.density_xy(**kwargs)
+        if self.discrete:
+            return x, density, x, np.minimum(np.cumsum(density), 1.0)
+        x_cdf, cdf = self.cdf_xy(**kwargs)
+        return x, density, x_cdf, cdf
+
     def get_density_figure(self, **kwargs):
         """
         return the density plot
         :param kwargs:
         :return:
         """
-        raise NotImplementedError
+        x, y, _, _ = self.curves_xy(**kwargs)
+        return build_figure(self.density_figure, x, y)
 
-    @abstractmethod
     def get_cumulative_figure(self, **kwargs):
         """
         return the cumulative probability plot
         :param kwargs:
         :return:
         """
-        raise NotImplementedError
+        _, _, x, y = self.curves_xy(**kwargs)
+        return build_figure(self.cumulative_figure, x, y)
 
-    @abstractmethod
     def get_figures(self, **kwargs):
         """
-        Returns all figures based on kwargs
+        Returns all figures based on kwargs, as plain figure dicts
             1. Density plot
             2. Cumulative plot
+        The dicts are cached when FIGURE_CACHE is set, their json encoding is not.
         :param kwargs:
         :return:
         """
-        raise NotImplementedError
+        if FIGURE_CACHE:
+            return self._get_cached_figures(**kwargs)
+        return self._get_figures(**kwargs)
+
+    def _get_figures(self, **kwargs):
+        x, density, x_cdf, cdf = self.curves_xy(**kwargs)
+        return (
+            build_figure(self.density_figure, x, density),
+            build_figure(self.cumulative_figure, x_cdf, cdf),
+        )
+
+    @cached
+    def _get_cached_figures(self, **kwargs):
+        return self._get_figures(**kwargs)
+
+    def default_parameters(self):
+        """
+        Returns the initial slider value of every parameter
+        :return:
+        dict mapping parameter name to its default value
+        """
+        return {parameter: values['value'] for parameter, values in self.parameters.items()}
+
+    def get_figure_skeletons(self):
+        """
+        Returns the figures at the default parameters without the trace x and y
+        and without the plotly template, as mounted for distributions that
+        are not displayed yet. They are rendered when first shown.
+        :return:
+        list of figure dicts
+        """
+        skeletons = []
+        for fig in self.get_figures(**self.default_parameters()):
+            data = [{k: v for k, v in trace.items() if k not in ('x', 'y')} for trace in fig['data']]
+            layout = {k: v for k, v in fig['layout'].items() if k != 'template'}
+            skeletons.append(dict(data=data, layout=layout))
+        return skeletons
+
+    def quantize(self, **kwargs):
+        """
+        Snaps every parameter to the grid of its slider, anchored at min with
+        spacing step. Integer parameters stay integers, unknown keys pass through.
+        :param kwargs: parameter values
+        :return:
+        dict of snapped parameter values
+        """
+        quantized = {}
+        for parameter, value in kwargs.items():
+            values = self.parameters.get(parameter)
+            if values is not None and value is not None:
+                steps = round((value - values['min']) / values['step'])
+                value = values['min'] + steps * values['step']
+                value = int(round(value)) if values['type'] == 'integer' else round(value, 12)
+            quantized[parameter] = value
+        return quantized
 
+    @cached
+    def discrete_support(self, **kwargs):
+        """
+        Returns the visible support 0, 1, ..., k - 1 of a discrete distribution,
+        where k is the ppf at 1 - SUPPORT_TAIL_MASS (capped at SUPPORT_MAX).
+        Computed once per parameter set and shared by density_xy and cdf_xy.
+        :param kwargs: shape parameters of self.fn
+        :return:
+        x : np.ndarray
+        """
+        upper = self.fn.ppf(1 - SUPPORT_TAIL_MASS, **kwargs)
+        if not np.isfinite(upper):
+            upper = SUPPORT_MAX
+        return np.arange(0, int(np.clip(upper, 1, SUPPORT_MAX)))
+
+    @cached
+    def continuous_support(self, **kwargs):
+        """
+        Returns the x values of a continuous distribution: an adaptive_grid of
+        the pdf, over its finite support or else between the CONTINUOUS_TAIL_MASS
+        quantiles. Shared by density_xy and cdf_xy.
+        :param kwargs: shape, loc and scale parameters of self.fn
+        :return:
+        x : np.ndarray
+        """
+        lower, upper = self.fn.support(**kwargs)
+        if not np.isfinite(lower):
+            lower = self.fn.ppf(CONTINUOUS_TAIL_MASS, **kwargs)
+        if not np.isfinite(upper):
+            upper = self.fn.ppf(1 - CONTINUOUS_TAIL_MASS, **kwargs)
+        return adaptive_grid(lambda x: self.fn.pdf(x, **kwargs), lower, upper)
+
+    def sample(self, size, random_state, **kwargs):
+        """
+        Draws size random samples through the rvs of self.fn
+        :param size: number of samples
+        :param random_state: np.random.Generator
+        :param kwargs: parameters of self.fn
+        :return:
+        np.ndarray
+        """
+        return self.fn.rvs(size=size, random_state=random_state, **kwargs)
+
+    def sampling_edges(self, **kwargs):
+        """
+        Returns where samples are counted: the bin edges of the histogram,
+        one unit bin per value for discrete distributions and SAMPLING_BINS
+        bins over the plotted range otherwise, and the x of the cumulative
+        plot, at which the ECDF is evaluated.
+        :param kwargs: parameters of the distribution
+        :return:
+        histogram_edges : np.ndarray
+        ecdf_grid : np.ndarray
+        """
+        x, _, x_cdf, _ = self.curves_xy(**kwargs)
+        if self.discrete:
+            return np.append(x, x[-1] + 1) - 0.5, x_cdf
+        return np.linspace(np.min(x), np.max(x), SAMPLING_BINS + 1), x_cdf
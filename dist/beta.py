@@ -1,7 +1,5 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import beta
-import numpy as np
 
 # Description compiled through chatgpt
 markdown_description = """
@@ -24,6 +22,22 @@ class Beta(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = beta
+        self.clientside_function = 'beta'
+        self.discrete = False
+        self.density_figure = dict(
+            title='PDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='density',
+            xrange=[0, 1.0],
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='probability',
+            xrange=[0, 1.0],
+        )
         self.parameters = dict(
             a=dict(
                 min=0.01,
@@ -35,12 +49,13 @@ class Beta(Distribution):
             b=dict(
                 min=0.01,
                 max=100.0,
-                value=0.627,
+                value=0.63,
                 step=0.01,
                 type='float'
             )
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pdf(x, a, b, loc=0, scale=1)
@@ -51,10 +66,11 @@ class Beta(Distribution):
         """
         a = kwargs['a']
         b = kwargs['b']
-        x = np.linspace(start=0, stop=1, num=1000)
+        x = self.continuous_support(a=a, b=b)
         y = self.fn.pdf(x=x, a=a, b=b)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(x, loc=0, scale=1)
@@ -63,84 +79,6 @@ class Beta(Distribution):
         """
         a = kwargs['a']
         b = kwargs['b']
-        x = np.linspace(start=0, stop=1, num=1000)
+        x = self.continuous_support(a=a, b=b)
         y = self.fn.cdf(x=x, a=a, b=b)
         return x, y
-
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, 1.0],
-                title=dict(text=r'x')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, 1.0],
-                title=dict(text="x")
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='probability')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
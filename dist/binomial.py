@@ -1,5 +1,4 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import binom
 import numpy as np
 
@@ -27,6 +26,20 @@ class Binomial(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = binom
+        self.clientside_function = 'binomial'
+        self.discrete = True
+        self.density_figure = dict(
+            title='PMF',
+            trace='bar',
+            xtitle='successes (k)',
+            ytitle='density',
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='successes (k)',
+            ytitle='probability',
+        )
         self.parameters = dict(
             n=dict(
                 min=1,
@@ -44,6 +57,7 @@ class Binomial(Distribution):
             )
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pmf(k, n, p, loc=0)
@@ -58,6 +72,7 @@ class Binomial(Distribution):
         y = self.fn.pmf(k=x, n=n, p=p)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(k, n, p, loc=0)
@@ -69,81 +84,3 @@ class Binomial(Distribution):
         x = np.arange(0, n + 1)
         y = self.fn.cdf(k=x, n=n, p=p)
         return x, y
-
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Bar(
-                x=x,
-                y=y,
-                #mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PMF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text=r'successes (k)')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text="successes (k)")
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='probability')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
@@ -1,3 +1,5 @@
+import os
+
 import plotly.graph_objects as go
 
 BASE_FIGURE_LAYOUT = go.Layout(
@@ -8,4 +10,35 @@ BASE_FIGURE_LAYOUT = go.Layout(
     yaxis=dict(zeroline=True, zerolinewidth=1, zerolinecolor='#333333'),
     paper_bgcolor='rgba(255,255,255,1)',
     plot_bgcolor='rgba(255,255,255,1)',
-)
\ No newline at end of file
+)
+
+# BASE_FIGURE_LAYOUT as a plain dict, including the default template go.Figure adds
+BASE_FIGURE_DICT_LAYOUT = go.Figure(layout=BASE_FIGURE_LAYOUT).to_dict()['layout']
+
+# Upper bound on the memory held by the shared result cache of the distributions
+CACHE_MAX_BYTES = 64 * 2 ** 20
+
+# Also cache the figure dicts returned by Distribution.get_figures. Dash still
+# encodes them to json on every response.
+FIGURE_CACHE = True
+
+# Open ended discrete supports are cut where the upper tail mass drops below
+# SUPPORT_TAIL_MASS, and never extend beyond SUPPORT_MAX
+SUPPORT_TAIL_MASS = 0.001
+SUPPORT_MAX = 1000
+
+# Continuous distributions are drawn between their CONTINUOUS_TAIL_MASS and
+# 1 - CONTINUOUS_TAIL_MASS quantiles (or the edge of a finite support), with
+# at most one point per horizontal pixel of the plot area. ADAPTIVE_PROBE_POINTS
+# uniform points probe the curvature that decides where the points go.
+CONTINUOUS_TAIL_MASS = 1e-5
+ADAPTIVE_MAX_POINTS = BASE_FIGURE_LAYOUT.width - BASE_FIGURE_LAYOUT.margin.l - BASE_FIGURE_LAYOUT.margin.r
+ADAPTIVE_PROBE_POINTS = 64
+
+# Monte Carlo sampling draws SAMPLING_CHUNK_SIZE samples at a time on a pool
+# of SAMPLING_WORKERS threads, and keeps at most SAMPLING_MAX_JOBS jobs around.
+# Continuous samples are binned into SAMPLING_BINS bins over the plotted range.
+SAMPLING_CHUNK_SIZE = 2 ** 16
+SAMPLING_WORKERS = min(4, os.cpu_count() or 1)
+SAMPLING_MAX_JOBS = 64
+SAMPLING_BINS = 60
@@ -0,0 +1,75 @@
+import base64
+import json
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+# Type codes of the typed array spec {dtype, bdata}, as used by plotly.js
+DTYPE_CODES = {
+    'float32': 'f4',
+    'float64': 'f8',
+}
+
+
+def encode_array(values, dtype='float32'):
+    """
+    Encodes an array as a base64 typed array
+    :param values: np.ndarray
+    :param dtype: 'float32' or 'float64'
+    :return:
+    dict(dtype=..., bdata=...)
+    """
+    values = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    return dict(dtype=DTYPE_CODES[dtype], bdata=base64.b64encode(values.tobytes()).decode('ascii'))
+
+
+def implicit_grid(x):
+    """
+    Returns (x0, dx) when x is an evenly spaced grid, like the np.arange and
+    np.linspace grids of the distributions, otherwise None
+    :param x: np.ndarray
+    :return:
+    tuple or None
+    """
+    if len(x) == 0:
+        return None
+    if len(x) == 1:
+        return x[0].item(), 1
+    dx = (x[-1] - x[0]) / (len(x) - 1)
+    if not np.allclose(np.diff(x), dx, rtol=1e-9, atol=0):
+        return None
+    return x[0].item(), dx.item()
+
+
+def encode_figure(figure, dtype='float32'):
+    """
+    Returns a copy of a figure dict with compact trace data: evenly spaced x
+    become x0/dx, all other x and y become base64 typed arrays.
+    :param figure: figure dict, as returned by Distribution.get_figures
+    :param dtype: float type of the encoded arrays
+    :return:
+    figure dict
+    """
+    data = []
+    for trace in figure['data']:
+        trace = dict(trace)
+        grid = implicit_grid(np.asarray(trace['x']))
+        if grid is None:
+            trace['x'] = encode_array(trace['x'], dtype)
+        else:
+            del trace['x']
+            trace['x0'], trace['dx'] = grid
+        trace['y'] = encode_array(trace['y'], dtype)
+        data.append(trace)
+    return dict(figure, data=data)
+
+
+def payload_size(figure):
+    """
+    Returns the size in bytes of the serialized trace data of a figure
+    :param figure: figure dict
+    :return:
+    int
+    """
+    return len(json.dumps(figure['data'], cls=PlotlyJSONEncoder))
+
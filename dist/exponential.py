@@ -1,7 +1,5 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import expon
-import numpy as np
 
 # Description compiled through chatgpt
 markdown_description = """
@@ -25,6 +23,20 @@ class Exponential(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = expon
+        self.clientside_function = 'exponential'
+        self.discrete = False
+        self.density_figure = dict(
+            title='PDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='density',
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='probability',
+        )
         self.parameters = dict(
             rate=dict(
                 min=0.01,
@@ -49,6 +61,7 @@ class Exponential(Distribution):
             )
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pdf(x, a, b, loc=0, scale=1)
@@ -60,10 +73,11 @@ class Exponential(Distribution):
         loc = kwargs['loc']
         scale = kwargs['scale']
         rate = kwargs['rate']
-        x = np.linspace(start=-100, stop=100, num=1000)
+        x = self.continuous_support(loc=loc, scale=scale)
         y = rate * self.fn.pdf(x=x, loc=loc, scale=scale)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(x, loc=0, scale=1)
@@ -72,84 +86,14 @@ class Exponential(Distribution):
         """
         loc = kwargs['loc']
         scale = kwargs['scale']
-        x = np.linspace(start=-100, stop=100, num=1000)
+        x = self.continuous_support(loc=loc, scale=scale)
         y = self.fn.cdf(x=x, loc=loc, scale=scale)
         return x, y
 
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[-100, 100],
-                title=dict(text=r'x')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[min(x), max(x)],
-                title=dict(text="x")
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='probability')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
+    def sample(self, size, random_state, **kwargs):
+        """
+        rvs(loc=0, scale=1), rate only scales the plotted density
+        :param kwargs:
+        :return:
+        """
+        return self.fn.rvs(size=size, random_state=random_state, loc=kwargs['loc'], scale=kwargs['scale'])
@@ -1,7 +1,5 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import gamma
-import numpy as np
 
 # Description compiled through chatgpt
 markdown_description = """
@@ -25,6 +23,20 @@ class Gamma(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = gamma
+        self.clientside_function = 'gamma'
+        self.discrete = False
+        self.density_figure = dict(
+            title='PDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='density',
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='probability',
+        )
         self.parameters = dict(
             a=dict(
                 min=0.01,
@@ -42,6 +54,7 @@ class Gamma(Distribution):
             ),
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pdf(x, a, loc=0, scale=1)
@@ -51,10 +64,11 @@ class Gamma(Distribution):
         """
         a = kwargs['a']
         scale = kwargs['scale']
-        x = np.linspace(start=0, stop=100, num=1000)
+        x = self.continuous_support(a=a, scale=scale)
         y = self.fn.pdf(x=x, a=a, scale=scale)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(x, loc=0, scale=1)
@@ -63,84 +77,6 @@ class Gamma(Distribution):
         """
         a = kwargs['a']
         scale = kwargs['scale']
-        x = np.linspace(start=0, stop=100, num=1000)
+        x = self.continuous_support(a=a, scale=scale)
         y = self.fn.cdf(x=x, a=a, scale=scale)
         return x, y
-
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[min(x), max(x)],
-                title=dict(text=r'x')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[min(x), max(x)],
-                title=dict(text="x")
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='probability')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
@@ -1,7 +1,5 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import geom
-import numpy as np
 
 # Description compiled through chatgpt
 markdown_description = """
@@ -24,6 +22,20 @@ class Geometric(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = geom
+        self.clientside_function = 'geometric'
+        self.discrete = True
+        self.density_figure = dict(
+            title='PMF',
+            trace='bar',
+            xtitle='successes (k)',
+            ytitle='density',
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='successes (k)',
+            ytitle='probability (p)',
+        )
         self.parameters = dict(
             p=dict(
                 min=0.0,
@@ -34,6 +46,7 @@ class Geometric(Distribution):
             )
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pmf(k, p, loc=0)
@@ -43,17 +56,12 @@ class Geometric(Distribution):
         """
         p = kwargs['p']
 
-        # Setup x-range
-        samples = np.arange(0, 1000)
-        cdf: np.ndarray = self.fn.cdf(k=samples, p=p)
-        msk = ~((1 - cdf) < 0.001)
-        max_index = msk.sum()
-
         # Draw sampels
-        x = np.arange(0, max_index)
+        x = self.discrete_support(p=p)
         y = self.fn.pmf(k=x, p=p)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(k, mu, loc=0)
@@ -62,90 +70,7 @@ class Geometric(Distribution):
         """
         p = kwargs['p']
 
-        # Setup x-range
-        samples = np.arange(0, 1000)
-        cdf: np.ndarray = self.fn.cdf(k=samples, p=p)
-        msk = ~((1 - cdf) < 0.001)
-        max_index = msk.sum()
-
         # Draw samples
-        x = np.arange(0, max_index)
+        x = self.discrete_support(p=p)
         y = self.fn.cdf(k=x, p=p)
         return x, y
-
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Bar(
-                x=x,
-                y=y,
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PMF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text=r'successes (k)')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text=r'successes (k)')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text=r'probability (p)')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
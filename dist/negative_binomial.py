@@ -1,7 +1,5 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import nbinom
-import numpy as np
 
 # Description compiled through chatgpt
 markdown_description = """
@@ -25,6 +23,20 @@ class NegativeBinomial(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = nbinom
+        self.clientside_function = 'negative_binomial'
+        self.discrete = True
+        self.density_figure = dict(
+            title='PMF',
+            trace='bar',
+            xtitle='successes (r)',
+            ytitle='density',
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='successes (r)',
+            ytitle='probability',
+        )
         self.parameters = dict(
             n=dict(
                 min=1,
@@ -42,6 +54,7 @@ class NegativeBinomial(Distribution):
             )
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pmf(k, n, p, loc=0)
@@ -53,18 +66,13 @@ class NegativeBinomial(Distribution):
         n = kwargs['n']
         p = kwargs['p']
 
-        # Setup x-range
-        samples = np.arange(0, 1000)
-        cdf: np.ndarray = self.fn.cdf(k=samples, n=n, p=p)
-        msk = ~((1 - cdf) < 0.001)
-        max_index = msk.sum()
-
         # Draw sampels
-        x = np.arange(0, max_index)
+        x = self.discrete_support(n=n, p=p)
 
         y = self.fn.pmf(k=x, n=n, p=p)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(k, n, p, loc=0)
@@ -74,91 +82,7 @@ class NegativeBinomial(Distribution):
         n = kwargs['n']
         p = kwargs['p']
 
-        # Setup x-range
-        samples = np.arange(0, 1000)
-        cdf: np.ndarray = self.fn.cdf(k=samples, n=n, p=p)
-        msk = ~((1 - cdf) < 0.001)
-        max_index = msk.sum()
-
         # Draw samples
-        x = np.arange(0, max_index)
+        x = self.discrete_support(n=n, p=p)
         y = self.fn.cdf(k=x, n=n, p=p)
         return x, y
-
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Bar(
-                x=x,
-                y=y,
-                #mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PMF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text=r'successes (r)')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text="successes (r)")
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='probability')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
@@ -1,7 +1,5 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import norm
-import numpy as np
 
 # Description compiled through chatgpt
 markdown_description = """
@@ -25,6 +23,21 @@ class Normal(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = norm
+        self.clientside_function = 'normal'
+        self.discrete = False
+        self.density_figure = dict(
+            title='PDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='density',
+            xrange=[-6, 6],
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='x',
+            ytitle='probability',
+        )
         self.parameters = dict(
             loc=dict(
                 min=-3.0,
@@ -42,6 +55,7 @@ class Normal(Distribution):
             )
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pdf(x, loc=0, scale=1)
@@ -52,10 +66,11 @@ class Normal(Distribution):
         """
         loc = kwargs['loc']
         scale = kwargs['scale']
-        x = np.linspace(start=-6, stop=6, num=1000)
+        x = self.continuous_support(loc=loc, scale=scale)
         y = self.fn.pdf(x=x, loc=loc, scale=scale)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(x, loc=0, scale=1)
@@ -64,84 +79,6 @@ class Normal(Distribution):
         """
         loc = kwargs['loc']
         scale = kwargs['scale']
-        x = np.linspace(start=loc - scale * 6, stop=loc + scale * 6, num=1000)
+        x = self.continuous_support(loc=loc, scale=scale)
         y = self.fn.cdf(x=x, loc=loc, scale=scale)
         return x, y
-
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[-6, 6],
-                title=dict(text=r'x')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                showgrid=True,
-                title=dict(text="x")
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='probability')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
@@ -1,7 +1,5 @@
-from . import Distribution, BASE_FIGURE_LAYOUT
-import plotly.graph_objects as go
+from . import Distribution, cached
 from scipy.stats import poisson
-import numpy as np
 
 # Description compiled through chatgpt
 markdown_description = """
@@ -25,6 +23,20 @@ class Poisson(Distribution):
     def __init__(self):
         self.description = markdown_description
         self.fn = poisson
+        self.clientside_function = 'poisson'
+        self.discrete = True
+        self.density_figure = dict(
+            title='PMF',
+            trace='bar',
+            xtitle='$k$ successes',
+            ytitle='density',
+        )
+        self.cumulative_figure = dict(
+            title='CDF',
+            trace='scatter',
+            xtitle='$k$ successes',
+            ytitle='probability $p$',
+        )
         self.parameters = dict(
             mu=dict(
                 min=0,
@@ -35,6 +47,7 @@ class Poisson(Distribution):
             )
         )
 
+    @cached
     def density_xy(self, **kwargs):
         """
         pmf(k, mu, loc=0)
@@ -43,10 +56,11 @@ class Poisson(Distribution):
         :return:
         """
         mu = kwargs['mu']
-        x = np.arange(0, mu * 2 + 10)
+        x = self.discrete_support(mu=mu)
         y = self.fn.pmf(k=x, mu=mu)
         return x, y
 
+    @cached
     def cdf_xy(self, **kwargs):
         """
         cdf(k, mu, loc=0)
@@ -54,83 +68,6 @@ class Poisson(Distribution):
         :return:
         """
         mu = kwargs['mu']
-        x = np.arange(0, mu * 2 + 10)
+        x = self.discrete_support(mu=mu)
         y = self.fn.cdf(k=x, mu=mu)
         return x, y
-
-    def get_density_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.density_xy(**kwargs)
-        fig.add_trace(
-            go.Bar(
-                x=x,
-                y=y,
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='PMF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text=r'$k$ successes')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text='density')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_cumulative_figure(self, **kwargs):
-        # Setup based figure
-        fig = go.Figure(
-            layout=BASE_FIGURE_LAYOUT
-        )
-
-        # Add trace
-        x, y = self.cdf_xy(**kwargs)
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=y,
-                mode='lines'
-            )
-        )
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text='CDF',
-                x=0.5,
-                xanchor='center',
-            ),
-            xaxis=dict(
-                range=[0, max(x)],
-                title=dict(text=r'$k$ successes')
-            ),
-            yaxis=dict(
-                range=[0, max(y)*1.1],
-                title=dict(text=r'probability $p$')
-            )
-        )
-
-        # Return results
-        return fig
-
-    def get_figures(self, **kwargs):
-        density = self.get_density_figure(**kwargs)
-        cumulative = self.get_cumulative_figure(**kwargs)
-        return density, cumulative
-
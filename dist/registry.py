@@ -0,0 +1,65 @@
+from collections.abc import Mapping
+from importlib import import_module
+from threading import Lock, Thread
+import time
+
+
+class LazyRegistry(Mapping):
+    """
+    Maps distribution names to Distribution instances. A distribution's module,
+    and with it scipy.stats, is only imported when the distribution is first
+    looked up, after which the instance is reused.
+    """
+    def __init__(self, paths):
+        """
+        :param paths: dict mapping name to 'module:Class'
+        """
+        self.paths = dict(paths)
+        self.load_times = {}
+        self._instances = {}
+        self._lock = Lock()
+
+    def __getitem__(self, name):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    module, cls = self.paths[name].split(':')
+                    start = time.perf_counter()
+                    instance = getattr(import_module(module), cls)()
+                    self.load_times[name] = time.perf_counter() - start
+                    self._instances[name] = instance
+        return instance
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def loaded(self):
+        """
+        Returns the names of the distributions instantiated so far
+        :return:
+        list of str
+        """
+        return list(self._instances)
+
+    def prewarm(self, names=None, then=None):
+        """
+        Loads distributions in a background thread
+        :param names: names to load, defaults to all
+        :param then: optional callable to run once they are loaded
+        :return:
+        the started thread
+        """
+        def load():
+            for name in names or self.paths:
+                self[name]
+            if then is not None:
+                then()
+
+        thread = Thread(target=load, name='prewarm-distributions', daemon=True)
+        thread.start()
+        return thread
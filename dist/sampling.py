@@ -0,0 +1,253 @@
+"""
+Streaming Monte Carlo sampling. Samples are drawn in chunks on a pool of
+worker threads and folded into fixed size sketches as they come in, so the
+memory of a job doesn't grow with the number of samples.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import uuid
+
+import numpy as np
+
+from .constants import SAMPLING_CHUNK_SIZE, SAMPLING_WORKERS, SAMPLING_MAX_JOBS
+
+# Color of the sample overlay, the second color of the default plotly template
+SAMPLE_COLOR = '#EF553B'
+
+
+class BinnedSketch:
+    """
+    Counts of samples between fixed edges, with an underflow and an overflow
+    count at either end. Sketches over the same edges merge by adding their
+    counts, so every chunk can be counted on its own.
+
+    side='right' counts the half open bins [e_i, e_i+1) of a histogram,
+    side='left' the bins (e_i, e_i+1], whose running sum is the ECDF at the edges.
+    """
+    def __init__(self, edges, side='right'):
+        self.edges = np.asarray(edges, dtype=float)
+        self.side = side
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def add(self, samples):
+        index = np.searchsorted(self.edges, samples, side=self.side)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if other.side != self.side or not np.array_equal(other.edges, self.edges):
+            raise ValueError('Only sketches over the same edges can be merged')
+        self.counts += other.counts
+        return self
+
+    def copy(self):
+        sketch = BinnedSketch(self.edges, self.side)
+        sketch.counts = self.counts.copy()
+        return sketch
+
+    def histogram(self):
+        """
+        Returns the empirical density of the bins between the edges, out of
+        all samples, so the areas sum to less than 1 when samples fell outside.
+        :return:
+        centers : np.ndarray
+        density : np.ndarray
+        widths : np.ndarray
+        """
+        widths = np.diff(self.edges)
+        centers = self.edges[:-1] + widths / 2
+        density = self.counts[1:-1] / (max(self.total, 1) * widths)
+        return centers, density, widths
+
+    def ecdf(self):
+        """
+        Returns the empirical cdf at the edges, for a side='left' sketch
+        :return:
+        x : np.ndarray
+        y : np.ndarray
+        """
+        return self.edges, np.cumsum(self.counts)[:-1] / max(self.total, 1)
+
+
+class SamplingJob:
+    """
+    Draws size samples of a distribution in chunks, into a histogram sketch
+    over the bins of its density plot and an ECDF sketch over the x of its
+    cumulative plot. Chunk i is always drawn from the i-th child of the seed,
+    whichever worker draws it.
+    """
+    def __init__(self, distribution, size, seed=None, **kwargs):
+        self.distribution = distribution
+        self.size = size
+        self.parameters = kwargs
+        histogram_edges, ecdf_grid = distribution.sampling_edges(**kwargs)
+        self.histogram = BinnedSketch(histogram_edges, side='right')
+        self.ecdf = BinnedSketch(ecdf_grid, side='left')
+        self.drawn = 0
+        self.cancelled = False
+        self.error = None
+        self._scheduled = 0
+        self._running = 0
+        self._seed = np.random.SeedSequence(seed)
+        self._executor = None
+        self._lock = Lock()
+
+    @property
+    def done(self):
+        return self._running == 0
+
+    def start(self, executor, workers):
+        """
+        Queues up to workers chunks on executor. Every chunk queues the next
+        one when it is done, behind the chunks of other jobs, so jobs share
+        the pool instead of a large one holding it until it is complete.
+        """
+        chunks = -(-self.size // SAMPLING_CHUNK_SIZE)
+        self._executor = executor
+        with self._lock:
+            self._running = max(min(workers, chunks), 0)
+        for _ in range(self._running):
+            executor.submit(self._work)
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _next_chunk(self):
+        with self._lock:
+            if self.cancelled or self.error is not None or self._scheduled >= self.size:
+                return None
+            size = min(SAMPLING_CHUNK_SIZE, self.size - self._scheduled)
+            self._scheduled += size
+            return size, self._seed.spawn(1)[0]
+
+    def _work(self):
+        queued = False
+        try:
+            chunk = self._next_chunk()
+            if chunk is None:
+                return
+            size, seed = chunk
+            samples = self.distribution.sample(size, np.random.default_rng(seed), **self.parameters)
+            # Counted outside the lock, only the merge is serialized
+            histogram = BinnedSketch(self.histogram.edges, 'right').add(samples)
+            ecdf = BinnedSketch(self.ecdf.edges, 'left').add(samples)
+            with self._lock:
+                self.histogram.merge(histogram)
+                self.ecdf.merge(ecdf)
+                self.drawn += size
+            try:
+                self._executor.submit(self._work)
+                queued = True
+            except RuntimeError:
+                # The executor was shut down
+                pass
+        except Exception as e:
+            self.error = e
+        finally:
+            if not queued:
+                with self._lock:
+                    self._running -= 1
+
+    def snapshot(self):
+        """
+        Returns a consistent copy of the progress and the sketches
+        :return:
+        dict with drawn, size, done, error, histogram and ecdf
+        """
+        with self._lock:
+            return dict(
+                drawn=self.drawn,
+                size=self.size,
+                done=self._running == 0,
+                error=None if self.error is None else repr(self.error),
+                histogram=self.histogram.copy(),
+                ecdf=self.ecdf.copy(),
+            )
+
+
+class Sampler:
+    """
+    Runs SamplingJobs on a shared thread pool and keeps the most recent
+    max_jobs of them by id, cancelling the ones it drops. Submitting returns
+    right away, so callers like dash callbacks never wait for the samples.
+    """
+    def __init__(self, workers, max_jobs):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sampling')
+        self._jobs = OrderedDict()
+        self._lock = Lock()
+
+    def submit(self, distribution, size, seed=None, **kwargs):
+        """
+        Starts drawing size samples of distribution
+        :param distribution: Distribution
+        :param size: number of samples
+        :param seed: optional seed for reproducible samples
+        :param kwargs: parameters of the distribution
+        :return:
+        job id
+        """
+        job = SamplingJob(distribution, size, seed=seed, **distribution.quantize(**kwargs))
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                _, dropped = self._jobs.popitem(last=False)
+                dropped.cancel()
+        job.start(self._executor, self.workers)
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.cancel()
+
+    def shutdown(self):
+        """
+        Cancels every job and stops the pool without waiting for it, e.g.
+        from the worker_exit hook of gunicorn
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+SAMPLER = Sampler(workers=SAMPLING_WORKERS, max_jobs=SAMPLING_MAX_JOBS)
+
+
+def overlay_traces(snapshot):
+    """
+    Builds the traces overlaid on the density and cumulative figures from a
+    SamplingJob snapshot: a histogram of the samples and their ECDF
+    :param snapshot: dict, see SamplingJob.snapshot
+    :return:
+    density trace : dict
+    cumulative trace : dict
+    """
+    centers, density, widths = snapshot['histogram'].histogram()
+    x, ecdf = snapshot['ecdf'].ecdf()
+    name = f"{snapshot['drawn']:,} samples"
+    histogram_trace = dict(
+        type='bar', x=centers, y=density, width=widths, name=name,
+        opacity=0.5, marker=dict(color=SAMPLE_COLOR, line=dict(width=0)), showlegend=False,
+    )
+    ecdf_trace = dict(
+        type='scatter', mode='lines', x=x, y=ecdf, name=name,
+        line=dict(color=SAMPLE_COLOR, shape='hv'), showlegend=False,
+    )
+    return histogram_trace, ecdf_trace
@@ -1,11 +1,19 @@
-from dash import Dash, html, dcc, callback, Input, Output, State, MATCH, ALL, callback_context
+from functools import lru_cache
+import os
+
+import numpy as np
+
+from dash import Dash, html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State, MATCH, ALL, Patch, ctx, no_update
 import dash_bootstrap_components as dbc
-from constants import DIST_NAMES, DISTNAME2DIST, D2I, I2D, INITIAL_DISTRIBUTION
+from constants import DIST_NAMES, DISTNAME2DIST, D2I, I2D, INITIAL_DISTRIBUTION, RENDER_MODE, CLIENTSIDE, FIGURE_ENCODING, BINARY, FIGURE_FLOAT_DTYPE
+from constants import SAMPLING_DEFAULT_SIZE, SAMPLING_MAX_SIZE, SAMPLING_INTERVAL_MS
+from dist import encode_figure, SAMPLER, overlay_traces, BASE_FIGURE_DICT_LAYOUT
+from dist.constants import ADAPTIVE_MAX_POINTS, ADAPTIVE_PROBE_POINTS
 
 
 app = Dash(
     __name__,
-    external_stylesheets=[dbc.themes.BOOTSTRAP]
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
 )
 
 dropdown = dbc.DropdownMenu(
@@ -21,162 +29,415 @@ dropdown = dbc.DropdownMenu(
     class_name='w-100'
 )
 
-desc_div = html.Div(
-    [
-        html.H4(
-            id='dist-title',
-            children=INITIAL_DISTRIBUTION,
-        ),
-        dcc.Markdown(
-            id='dist-description',
-            children=[DISTNAME2DIST[INITIAL_DISTRIBUTION].description],
-            mathjax=True,
-        ),
-    ]
-)
+HIDDEN = {'display': 'none'}
+VISIBLE = {}
 
-counter = 0
-sliderids2dist = {}
-dist_control_divs = {}
-for i, d in I2D.items():
-    distribution = DISTNAME2DIST[d]
-    dist_controls = []
-    for parameter, values in distribution.parameters.items():
-        label = dbc.Label(parameter + ':')
-        slider = dcc.Slider(
-            id={'type': 'slider', 'index': counter, 'parameter': parameter},
-            min=values['min'],
-            max=values['max'],
-            value=values['value'],
-            step=values['step'],
-            marks=None,
-            updatemode='drag',
-            tooltip={
-                "always_visible": True,
-                "placement": "bottom"
-            },
-            className='w-75 align-self-bottom mt-4 mb-2'
-        )
-        div = html.Div(
-            children=[label, slider],
-            className='hstack gap-2'
-        )
-        dist_controls.append(div)
-        sliderids2dist[counter] = d
-        counter += 1
-    dist_control_divs[d] = html.Div(
-        id={'type': 'parameter-control-div', 'index': i},
-        children=dist_controls
-    )
 
+@lru_cache(maxsize=None)
+def serve_layout():
+    """
+    Builds the layout on the first page load rather than at import, so a
+    worker is ready before scipy is imported and the distributions are
+    instantiated. The tree is built once and reused.
+    """
+    desc_div = html.Div(
+        [
+            html.H4(
+                id='dist-title',
+                children=INITIAL_DISTRIBUTION,
+            ),
+            dcc.Markdown(
+                id='dist-description',
+                children=[DISTNAME2DIST[INITIAL_DISTRIBUTION].description],
+                mathjax=True,
+            ),
+        ]
+    )
 
-D = DISTNAME2DIST[INITIAL_DISTRIBUTION]
-figs = D.get_figures(**{'n':20, 'p':0.5})
+    # Every distribution gets its own controls and figures, mounted once.
+    # Switching distributions only toggles which of them are visible. Only the
+    # initial distribution is rendered up front, the others are mounted as
+    # skeletons and rendered the first time they are shown (see request_render).
+    dist_control_divs = {}
+    dist_fig_divs = {}
+    for i, d in I2D.items():
+        distribution = DISTNAME2DIST[d]
+        style = VISIBLE if d == INITIAL_DISTRIBUTION else HIDDEN
+        dist_controls = []
+        for parameter, values in distribution.parameters.items():
+            label = dbc.Label(parameter + ':')
+            slider = dcc.Slider(
+                id={'type': 'slider', 'index': i, 'parameter': parameter},
+                min=values['min'],
+                max=values['max'],
+                value=values['value'],
+                step=values['step'],
+                marks=None,
+                updatemode='drag',
+                tooltip={
+                    "always_visible": True,
+                    "placement": "bottom"
+                },
+                className='w-75 align-self-bottom mt-4 mb-2'
+            )
+            div = html.Div(
+                children=[label, slider],
+                className='hstack gap-2'
+            )
+            dist_controls.append(div)
+        dist_control_divs[d] = html.Div(
+            id={'type': 'parameter-control-div', 'index': i},
+            children=dist_controls,
+            style=style,
+        )
 
-graphs = []
-for i, f in enumerate(figs):
-    graphs.append(
-        dcc.Graph(
-            id={'type': 'graph', 'index': i},
-            figure=f,
-            responsive=False,
+        if d == INITIAL_DISTRIBUTION:
+            density, cumulative = distribution.get_figures(**distribution.default_parameters())
+        else:
+            density, cumulative = distribution.get_figure_skeletons()
+        graphs = [
+            dcc.Graph(
+                id={'type': 'density-graph', 'index': i},
+                figure=density,
+                responsive=False,
+            ),
+            dcc.Graph(
+                id={'type': 'cumulative-graph', 'index': i},
+                figure=cumulative,
+                responsive=False,
+            ),
+        ]
+        dist_fig_divs[d] = html.Div(
+            id={'type': 'fig-div', 'index': i},
+            children=html.Div(
+                children=graphs,
+                className='d-flex flex-wrap hstack gap-2'
+            ),
+            style=style,
         )
-    )
 
-fig_div = html.Div(
-    id='dist-fig-div',
-    children=graphs,
-    className='d-flex flex-wrap hstack gap-2'
-)
 
+    # Title and description of every distribution, cached on the client
+    dist_info = {
+        i: dict(title=d, description=DISTNAME2DIST[d].description)
+        for i, d in I2D.items()
+    }
 
-app.layout = html.Div([
-    dbc.Container(
+    # The clientside renderer swaps new trace data into the displayed figures,
+    # all it needs per distribution index is the name of its evaluator, plus
+    # the plotly template the skeletons leave out and the adaptive grid sizes
+    clientside_spec = None
+    if RENDER_MODE == CLIENTSIDE:
+        clientside_spec = dict(
+            evaluators={i: DISTNAME2DIST[d].clientside_function for i, d in I2D.items()},
+            template=BASE_FIGURE_DICT_LAYOUT['template'],
+            grid=dict(points=ADAPTIVE_MAX_POINTS, probe=ADAPTIVE_PROBE_POINTS),
+        )
+
+    sampling_div = html.Div(
         [
-            dbc.Row(
-                dbc.Col(dropdown, class_name='w-100'),
-                class_name='m-2 w-100'
-            ),
-            dbc.Row(
-                dbc.Col(desc_div),
-                class_name='border rounded m-2'
-            ),
-            dbc.Row(
-                dbc.Col(
-                    id='sliders-col',
-                    children=dist_control_divs[INITIAL_DISTRIBUTION],
-                    class_name='justify-content-center w-100'
-                ),
-                class_name='border rounded m-2 justify-content-center'
-            ),
-            dbc.Row(
-                dbc.Col(fig_div, class_name='d-flex justify-content-center'),
-                class_name='border rounded m-2 align-center'
+            dbc.Label('samples:'),
+            dcc.Input(
+                id='sample-size',
+                type='number',
+                min=1,
+                max=SAMPLING_MAX_SIZE,
+                step=1,
+                value=SAMPLING_DEFAULT_SIZE,
             ),
+            dbc.Button('Sample', id='sample-button', n_clicks=0, size='sm'),
+            html.Span(id='sampling-progress', className='text-muted'),
         ],
-        style={'max-width': '800px'}
+        className='hstack gap-2 p-2'
     )
+
+    return html.Div([
+        dbc.Container(
+            [
+                dbc.Row(
+                    dbc.Col(dropdown, class_name='w-100'),
+                    class_name='m-2 w-100'
+                ),
+                dbc.Row(
+                    dbc.Col(desc_div),
+                    class_name='border rounded m-2'
+                ),
+                dbc.Row(
+                    dbc.Col(
+                        id='sliders-col',
+                        children=list(dist_control_divs.values()),
+                        class_name='justify-content-center w-100'
+                    ),
+                    class_name='border rounded m-2 justify-content-center'
+                ),
+                dbc.Row(
+                    dbc.Col(
+                        id='dist-fig-div',
+                        children=list(dist_fig_divs.values()),
+                        class_name='d-flex justify-content-center'
+                    ),
+                    class_name='border rounded m-2 align-center'
+                ),
+                dbc.Row(
+                    dbc.Col(sampling_div),
+                    class_name='border rounded m-2'
+                ),
+            ],
+            style={'max-width': '800px'}
+        ),
+        dcc.Store(id='active-distribution', data=D2I[INITIAL_DISTRIBUTION]),
+        dcc.Store(id='dist-info', data=dist_info),
+        dcc.Store(id='clientside-spec', data=clientside_spec),
+        *[dcc.Store(id={'type': 'figure-data', 'index': i}) for i in I2D],
+        *[dcc.Store(id={'type': 'render-request', 'index': i}) for i in I2D],
+        dcc.Store(id='sampling-job'),
+        dcc.Interval(id='sampling-interval', interval=SAMPLING_INTERVAL_MS, disabled=True),
+    ])
+
+
+# The callbacks are validated against this static tree, with one component per
+# id and id pattern, rather than by calling serve_layout at import, which
+# would load every distribution
+app.validation_layout = html.Div([
+    dropdown,
+    html.H4(id='dist-title'),
+    dcc.Markdown(id='dist-description'),
+    dbc.Col(id='sliders-col'),
+    dbc.Col(id='dist-fig-div'),
+    html.Div(id={'type': 'parameter-control-div', 'index': 0}),
+    dcc.Slider(id={'type': 'slider', 'index': 0, 'parameter': 'p'}),
+    html.Div(id={'type': 'fig-div', 'index': 0}),
+    dcc.Graph(id={'type': 'density-graph', 'index': 0}),
+    dcc.Graph(id={'type': 'cumulative-graph', 'index': 0}),
+    dcc.Input(id='sample-size'),
+    dbc.Button(id='sample-button'),
+    html.Span(id='sampling-progress'),
+    dcc.Store(id='active-distribution'),
+    dcc.Store(id='dist-info'),
+    dcc.Store(id='clientside-spec'),
+    dcc.Store(id={'type': 'figure-data', 'index': 0}),
+    dcc.Store(id={'type': 'render-request', 'index': 0}),
+    dcc.Store(id='sampling-job'),
+    dcc.Interval(id='sampling-interval'),
 ])
+app.layout = serve_layout
 
-@callback(
+
+def prewarm():
+    """
+    Loads the displayed distributions and builds the layout in a background
+    thread, so the first page load doesn't pay for it. Call it once the
+    server is up, e.g. from the post_worker_init hook of gunicorn.
+    """
+    return DISTNAME2DIST.prewarm(DIST_NAMES, then=serve_layout)
+
+
+clientside_callback(
+    ClientsideFunction(namespace='distributions', function_name='select_distribution'),
+    Output('active-distribution', 'data'),
+    Input({'type': 'dist-select', 'index': ALL}, 'n_clicks'),
+    prevent_initial_call=True,
+)
+
+
+clientside_callback(
+    ClientsideFunction(namespace='distributions', function_name='show_distribution'),
     [
-        Output('sliders-col', 'children'),
-        Output('dist-description', 'children'),
+        Output({'type': 'parameter-control-div', 'index': ALL}, 'style'),
+        Output({'type': 'fig-div', 'index': ALL}, 'style'),
         Output('dist-title', 'children'),
+        Output('dist-description', 'children'),
     ],
     [
-        Input({'type':'dist-select', 'index':ALL}, 'n_clicks'),
+        Input('active-distribution', 'data'),
+        State({'type': 'parameter-control-div', 'index': ALL}, 'id'),
+        State('dist-info', 'data'),
     ],
-    config_prevent_initial_callbacks=True
+    prevent_initial_call=True,
+)
+
+
+def slider_parameters(slider_values, slider_ids, index=None):
+    """
+    Maps the slider values to the parameters of a distribution, of index if
+    given, otherwise of the first slider
+    """
+    if index is None:
+        index = slider_ids[0]['index']
+    return {
+        slider['parameter']: value
+        for value, slider in zip(slider_values, slider_ids) if slider['index'] == index
+    }
+
+
+# A skeleton figure asks to be rendered when its distribution is first shown
+clientside_callback(
+    ClientsideFunction(namespace='distributions', function_name='request_render'),
+    Output({'type': 'render-request', 'index': MATCH}, 'data'),
+    Input({'type': 'fig-div', 'index': MATCH}, 'style'),
+    State({'type': 'density-graph', 'index': MATCH}, 'figure'),
+    prevent_initial_call=True,
 )
-def change_distribution(_):
-    ctx = callback_context
 
-    if not ctx.triggered:
-        return None, None, None  # No input has triggered the callback, return default or empty
 
-    # Get the id of the component that triggered the callback
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    trigger_id = eval(trigger_id)  # Convert string representation of dict back to dict
+def update_figure(slider_values, render_request, slider_ids):
+    parameters = slider_parameters(slider_values, slider_ids)
+
+    D = DISTNAME2DIST[I2D[slider_ids[0]['index']]]
+    return D.get_figures(**parameters)
+
+
+def update_figure_data(slider_values, render_request, slider_ids):
+    return [encode_figure(f, FIGURE_FLOAT_DTYPE) for f in update_figure(slider_values, render_request, slider_ids)]
+
+
+# Only the sliders of the distribution that changed (MATCH) update its figures
+figure_outputs = [
+    Output({'type': 'density-graph', 'index': MATCH}, 'figure'),
+    Output({'type': 'cumulative-graph', 'index': MATCH}, 'figure'),
+]
+slider_inputs = [
+    Input({'type': 'slider', 'index': MATCH, 'parameter': ALL}, 'value'),
+    Input({'type': 'render-request', 'index': MATCH}, 'data'),
+    State({'type': 'slider', 'index': MATCH, 'parameter': ALL}, 'id'),
+]
+
+if RENDER_MODE == CLIENTSIDE:
+    clientside_callback(
+        ClientsideFunction(namespace='distributions', function_name='update_figure'),
+        figure_outputs,
+        slider_inputs + [
+            State({'type': 'density-graph', 'index': MATCH}, 'figure'),
+            State({'type': 'cumulative-graph', 'index': MATCH}, 'figure'),
+            State('clientside-spec', 'data'),
+        ],
+        prevent_initial_call=True,
+    )
+elif FIGURE_ENCODING == BINARY:
+    # The bundled plotly.js can't read typed array specs, decode them in the browser
+    callback(
+        Output({'type': 'figure-data', 'index': MATCH}, 'data'),
+        slider_inputs,
+        prevent_initial_call=True,
+    )(update_figure_data)
+    clientside_callback(
+        ClientsideFunction(namespace='distributions', function_name='decode_figures'),
+        figure_outputs,
+        Input({'type': 'figure-data', 'index': MATCH}, 'data'),
+        prevent_initial_call=True,
+    )
+else:
+    callback(
+        figure_outputs,
+        slider_inputs,
+        prevent_initial_call=True,
+    )(update_figure)
 
-    if trigger_id:
-        index = trigger_id['index']  # Extract the index of the triggered component
-        dist = dist_control_divs[I2D[index]]
-        md = DISTNAME2DIST[I2D[index]].description
-        title = I2D[index]
-        return dist, md, title
 
-    return None, None, None
 
+# Monte Carlo overlay. The samples are drawn on the SAMPLER thread pool, the
+# callbacks only start a job and read its running counts, so they return
+# right away however many samples are requested. Every poll patches the
+# overlay traces of the figures in place, the analytic traces are not resent.
+all_sliders = [
+    State({'type': 'slider', 'index': ALL, 'parameter': ALL}, 'value'),
+    State({'type': 'slider', 'index': ALL, 'parameter': ALL}, 'id'),
+]
 
 
 @callback(
-    Output('dist-fig-div', 'children'),
-    [
-        Input({'type': 'slider', 'index': ALL, 'parameter': ALL}, 'value'),
-        Input('sliders-col', 'children'),
-        State({'type': 'slider', 'index': ALL, 'parameter': ALL}, 'id'),
+    Output('sampling-job', 'data'),
+    Output('sampling-interval', 'disabled'),
+    Input('sample-button', 'n_clicks'),
+    State('sample-size', 'value'),
+    State('active-distribution', 'data'),
+    *all_sliders,
+    State('sampling-job', 'data'),
+    prevent_initial_call=True,
+)
+def start_sampling(_, size, index, slider_values, slider_ids, job):
+    if job is not None:
+        SAMPLER.cancel(job['id'])
+
+    # The bounds of the input are only enforced by the browser
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        return None, True
+    if size < 1:
+        return None, True
+    size = min(size, SAMPLING_MAX_SIZE)
+
+    parameters = slider_parameters(slider_values, slider_ids, index)
+    job_id = SAMPLER.submit(DISTNAME2DIST[I2D[index]], size, **parameters)
+    return dict(id=job_id, index=index, parameters=parameters), False
+
+
+def patch_figures(index, density_patch, cumulative_patch):
+    """
+    Returns the density and cumulative figure outputs of update_sampling,
+    with the patches for the graphs of distribution index
+    """
+    return [
+        [patch if o['id']['index'] == index else no_update for o in outputs]
+        for outputs, patch in zip(ctx.outputs_list[:2], [density_patch, cumulative_patch])
     ]
+
+
+@callback(
+    Output({'type': 'density-graph', 'index': ALL}, 'figure', allow_duplicate=True),
+    Output({'type': 'cumulative-graph', 'index': ALL}, 'figure', allow_duplicate=True),
+    Output('sampling-progress', 'children'),
+    Output('sampling-interval', 'disabled', allow_duplicate=True),
+    Input('sampling-interval', 'n_intervals'),
+    State('sampling-job', 'data'),
+    *all_sliders,
+    prevent_initial_call=True,
 )
-def update_figure(slider_values, _,slider_ids):
-    parameters = {}
-    for i, slider in enumerate(slider_ids):
-        par = slider['parameter']
-        parameters[par] = slider_values[i]
-
-    D = DISTNAME2DIST[sliderids2dist[slider_ids[0]['index']]]
-    figs = D.get_figures(**parameters)
-
-    graphs = []
-    for i, f in enumerate(figs):
-        graphs.append(
-            dcc.Graph(
-                figure=f,
-                responsive=False,
-            )
-        )
-    return graphs
+def update_sampling(_, job, slider_values, slider_ids):
+    unchanged = [[no_update] * len(outputs) for outputs in ctx.outputs_list[:2]]
+    sampling_job = SAMPLER.get(job['id']) if job is not None else None
+    if sampling_job is None:
+        return *unchanged, '', True
+
+    index = job['index']
+    D = DISTNAME2DIST[I2D[index]]
+    parameters = slider_parameters(slider_values, slider_ids, index)
+    if parameters != job['parameters']:
+        # The sliders moved, so the samples are stale. The figures were
+        # redrawn, but a poll that was in flight may have patched the overlay
+        # back onto them, so remove it and restore the y range of the curve.
+        SAMPLER.cancel(job['id'])
+        _, density, _, _ = D.curves_xy(**parameters)
+        density_patch = Patch()
+        del density_patch['data'][1]
+        density_patch['layout']['yaxis']['range'] = [0, np.max(density, where=np.isfinite(density), initial=0) * 1.1]
+        cumulative_patch = Patch()
+        del cumulative_patch['data'][1]
+        return *patch_figures(index, density_patch, cumulative_patch), '', True
+
+    snapshot = sampling_job.snapshot()
+    _, density, _, _ = D.curves_xy(**job['parameters'])
+    histogram, ecdf = overlay_traces(snapshot)
+
+    density_patch = Patch()
+    density_patch['data'][1] = histogram
+    density_patch['layout']['barmode'] = 'overlay'
+    ymax = max(np.max(density, where=np.isfinite(density), initial=0), np.max(histogram['y'], initial=0))
+    density_patch['layout']['yaxis']['range'] = [0, ymax * 1.1]
+    cumulative_patch = Patch()
+    cumulative_patch['data'][1] = ecdf
+
+    progress = f"{snapshot['drawn']:,} of {snapshot['size']:,} samples"
+    if snapshot['error'] is not None:
+        progress += f" (failed: {snapshot['error']})"
+    return *patch_figures(index, density_patch, cumulative_patch), progress, snapshot['done']
 
 
 if __name__ == '__main__':
+    # The debug reloader runs the app in a child process and only watches
+    # files in this one, so only the child prewarms (in the background, while
+    # the server starts). Under gunicorn, call prewarm from post_worker_init.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        prewarm()
     app.run(debug=True)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from dist import CACHE, LRUCache, Normal, Binomial
+from dist.base import sizeof
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    CACHE.clear()
+    yield
+    CACHE.clear()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_bytes=3 * 800)
+    for key in 'abc':
+        cache.put(key, np.zeros(100))
+    cache.get('a')
+    cache.put('d', np.zeros(100))
+
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 3 * 800
+
+
+def test_lru_skips_values_larger_than_the_bound():
+    cache = LRUCache(max_bytes=800)
+    cache.put('a', np.zeros(100))
+    cache.put('a', np.zeros(101))
+
+    assert cache.get('a') is None
+    assert len(cache) == 0
+    assert cache.stats()['bytes'] == 0
+
+
+def test_lru_counts_shared_arrays_once():
+    cache = LRUCache(max_bytes=10 ** 6)
+    x, y = np.zeros(100), np.ones(100)
+    both, single = (x, y), (x,)
+    cache.put('a', both)
+    cache.put('b', single)
+    assert cache.stats()['bytes'] == sizeof(both) + sizeof(single) + 2 * 800
+
+    # x stays counted while 'b' holds it, y is freed with 'a'
+    cache.put('a', None)
+    assert cache.stats()['bytes'] == sizeof(None) + sizeof(single) + 800
+
+    cache.put('b', None)
+    assert cache.stats()['bytes'] == 2 * sizeof(None)
+
+
+def test_cached_results_are_shared_and_read_only():
+    distribution = Normal()
+    first = distribution.curves_xy(loc=0, scale=1)
+    second = distribution.curves_xy(loc=0.001, scale=1.004)
+
+    assert second is first
+    for array in first:
+        assert not array.flags.writeable
+        with pytest.raises(ValueError):
+            array[0] = 0
+
+
+def test_quantize_snaps_to_the_slider_grid():
+    assert Normal().quantize(loc=0.123456, scale=1.0049) == dict(loc=0.12, scale=1.0)
+    assert Normal().quantize(loc=-3.0, scale=3.0) == dict(loc=-3.0, scale=3.0)
+
+
+def test_quantize_keeps_integers_and_unknown_keys():
+    quantized = Binomial().quantize(n=20.4, p=0.504, other='value')
+
+    assert quantized == dict(n=20, p=0.5, other='value')
+    assert isinstance(quantized['n'], int)
+    assert Binomial().quantize(n=None) == dict(n=None)
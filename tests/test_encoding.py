@@ -0,0 +1,50 @@
+import base64
+
+import numpy as np
+import pytest
+
+from dist import Normal, Binomial, encode_figure
+from dist.encoding import implicit_grid
+
+
+def decode_array(encoded):
+    dtype = dict(f4='<f4', f8='<f8')[encoded['dtype']]
+    return np.frombuffer(base64.b64decode(encoded['bdata']), dtype=dtype)
+
+
+def trace_x(trace):
+    if 'x0' in trace:
+        return trace['x0'] + trace['dx'] * np.arange(len(decode_array(trace['y'])))
+    return decode_array(trace['x'])
+
+
+@pytest.mark.parametrize('x', [np.arange(0, 25), np.linspace(-6, 6, 360), np.array([2.5])])
+def test_implicit_grid_round_trips_even_grids(x):
+    x0, dx = implicit_grid(x)
+
+    np.testing.assert_allclose(x0 + dx * np.arange(len(x)), x, rtol=1e-12, atol=1e-12)
+
+
+def test_implicit_grid_rejects_uneven_grids():
+    assert implicit_grid(np.array([0.0, 1.0, 3.0])) is None
+    assert implicit_grid(np.array([])) is None
+    assert implicit_grid(Normal().continuous_support(loc=0, scale=1)) is None
+
+
+@pytest.mark.parametrize('distribution', [Normal(), Binomial()], ids=lambda distribution: type(distribution).__name__)
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+def test_encode_figure_round_trips(distribution, dtype):
+    for figure in distribution.get_figures(**distribution.default_parameters()):
+        encoded = encode_figure(figure, dtype=dtype)
+        assert encoded['layout'] is figure['layout']
+        for trace, original in zip(encoded['data'], figure['data']):
+            np.testing.assert_allclose(trace_x(trace), original['x'].astype(dtype), rtol=1e-6)
+            np.testing.assert_array_equal(decode_array(trace['y']), original['y'].astype(dtype))
+
+
+def test_encode_figure_leaves_the_figure_untouched():
+    figure = Binomial().get_figures(n=20, p=0.5)[0]
+    encode_figure(figure)
+
+    assert isinstance(figure['data'][0]['x'], np.ndarray)
+    assert isinstance(figure['data'][0]['y'], np.ndarray)
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import numpy as np
+import pytest
+
+from dist import BinnedSketch, SamplingJob, Normal, Poisson
+
+
+def test_histogram_counts_half_open_bins():
+    sketch = BinnedSketch([0, 1, 2], side='right').add([-1, 0, 0.5, 1, 2, 3])
+
+    np.testing.assert_array_equal(sketch.counts, [1, 2, 1, 2])
+    centers, density, widths = sketch.histogram()
+    np.testing.assert_allclose(centers, [0.5, 1.5])
+    np.testing.assert_allclose(density, [2 / 6, 1 / 6])
+    np.testing.assert_allclose(widths, [1, 1])
+
+
+def test_ecdf_matches_the_empirical_cdf():
+    samples = np.random.default_rng(0).normal(size=1000)
+    edges = np.linspace(-3, 3, 25)
+    x, y = BinnedSketch(edges, side='left').add(samples).ecdf()
+
+    np.testing.assert_array_equal(x, edges)
+    np.testing.assert_allclose(y, np.mean(samples[:, None] <= edges, axis=0))
+
+
+def test_merged_chunks_equal_a_single_pass():
+    samples = np.random.default_rng(1).normal(size=1000)
+    edges = np.linspace(-2, 2, 11)
+    merged = BinnedSketch(edges).add(samples[:300])
+    merged.merge(BinnedSketch(edges).add(samples[300:]))
+
+    np.testing.assert_array_equal(merged.counts, BinnedSketch(edges).add(samples).counts)
+    assert merged.total == 1000
+
+
+def test_merge_rejects_other_edges_or_side():
+    sketch = BinnedSketch([0, 1, 2])
+    with pytest.raises(ValueError):
+        sketch.merge(BinnedSketch([0, 1, 3]))
+    with pytest.raises(ValueError):
+        sketch.merge(BinnedSketch([0, 1, 2], side='left'))
+
+
+def test_copy_is_independent():
+    sketch = BinnedSketch([0, 1]).add([0.5])
+    copy = sketch.copy().add([0.5])
+
+    assert sketch.total == 1
+    assert copy.total == 2
+
+
+def run(job, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        job.start(executor, workers)
+        deadline = time.monotonic() + 30
+        while not job.done and time.monotonic() < deadline:
+            time.sleep(0.01)
+    return job.snapshot()
+
+
+@pytest.mark.parametrize('distribution, parameters', [
+    (Normal(), dict(loc=0, scale=1)),
+    (Poisson(), dict(mu=4)),
+], ids=['Normal', 'Poisson'])
+def test_sampling_job_is_reproducible_across_workers(distribution, parameters):
+    single = run(SamplingJob(distribution, 200_000, seed=7, **parameters), workers=1)
+    pooled = run(SamplingJob(distribution, 200_000, seed=7, **parameters), workers=4)
+
+    assert single['done'] and single['error'] is None
+    assert single['drawn'] == single['histogram'].total == single['ecdf'].total == 200_000
+    np.testing.assert_array_equal(single['histogram'].counts, pooled['histogram'].counts)
+    np.testing.assert_array_equal(single['ecdf'].counts, pooled['ecdf'].counts)